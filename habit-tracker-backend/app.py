@@ -1,11 +1,18 @@
 import os
+import sqlite3
 from pathlib import Path
 from datetime import date, datetime, timedelta
 
-from flask import Flask, request, jsonify  
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask import Flask, Blueprint, current_app, request, jsonify
+from flask.cli import with_appcontext
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, create_engine, event
+from sqlalchemy.orm import Session
 
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -13,26 +20,22 @@ from werkzeug.security import generate_password_hash, check_password_hash
 # Optional in dev: allow Svelte (5173) to call /api/*
 # from flask_cors import CORS
 
-app = Flask(__name__, instance_relative_config=True)
-# CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})  # ← enable if not using Vite proxy
-
-# --- Database setup (SQLite under instance/) ---
-Path(app.instance_path).mkdir(parents=True, exist_ok=True)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(app.instance_path, "habits.db")
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# --- Extensions (bound to an app in create_app) ---
+db = SQLAlchemy()
+migrate = Migrate()
+login_manager = LoginManager()
 
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+api = Blueprint("api", __name__)
 
-# --- app + session cookie tweaks (optional but good) ---
-app.config.update(
-    SESSION_COOKIE_HTTPONLY=True,
-    SESSION_COOKIE_SAMESITE="Lax",  # fine for same-site proxy
-    # SESSION_COOKIE_SECURE=True,   # enable in production (HTTPS)
-)
+# In-memory SQLite for tests/benchmarks: every app gets its own isolated DB
+# and the schema is created on startup since there is nothing to migrate.
+TEST_CONFIG = {
+    "TESTING": True,
+    "SQLALCHEMY_DATABASE_URI": "sqlite://",
+    "CREATE_SCHEMA": True,
+}
 
 # --- Login manager ---
-login_manager = LoginManager(app)
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -69,25 +72,57 @@ class User(db.Model, UserMixin):
     def set_password(self, raw): self.password_hash = generate_password_hash(raw)
     def check_password(self, raw): return check_password_hash(self.password_hash, raw)
 
+# --- Read helpers (take a session so the dashboard can run them off-thread) ---
+
+PALETTE = ['#FF6B6B','#6BCB77','#4D96FF','#FFD93D','#A66DD4','#00C49A','#FBA834','#FF90BC','#8ACDD7','#BDB2FF']
+
+def _habit_json(h: Habit):
+    return {
+        "id": h.id,
+        "name": h.name,
+        "streak": h.streak,
+        "created": h.created.isoformat(),
+        "last_completed": h.last_completed.isoformat() if h.last_completed else None,
+        "history": [c.done_on.isoformat() for c in h.completions.order_by(Completion.done_on.asc())]
+    }
+
+def _habits_json(s):
+    habits = s.query(Habit).order_by(Habit.created.desc()).all()
+    return [_habit_json(h) for h in habits]
+
+def _stats_json(s):
+    streaks = [streak or 0 for (streak,) in s.query(Habit.streak).all()]
+    total_habits = len(streaks)
+    total_completions = sum(streaks)
+    longest_streak = max(streaks, default=0)
+    average_streak = round(total_completions / total_habits, 2) if total_habits else 0
+    return {
+        "total_habits": total_habits,
+        "total_completions": total_completions,
+        "longest_streak": longest_streak,
+        "average_streak": average_streak
+    }
+
+def _calendar_events(s, start=None, end=None):
+    # colour follows position among all habits so it matches /api/calendar
+    colors = {hid: PALETTE[i % len(PALETTE)]
+              for i, (hid,) in enumerate(s.query(Habit.id).order_by(Habit.id.asc()))}
+    q = (s.query(Habit.id, Habit.name, Completion.done_on)
+         .join(Completion, Completion.habit_id == Habit.id))
+    if start:
+        q = q.filter(Completion.done_on >= start)
+    if end:
+        q = q.filter(Completion.done_on < end)
+    return [{"title": name, "start": done_on.isoformat(), "color": colors[hid]}
+            for hid, name, done_on in q.order_by(Habit.id.asc(), Completion.done_on.asc())]
+
 # --- API ROUTES ONLY ---
 
-@app.get("/api/habits")
+@api.get("/api/habits")
 def api_habits():
-    habits = Habit.query.order_by(Habit.created.desc()).all()
-    return jsonify({
-        "habits": [
-            {
-                "id": h.id,
-                "name": h.name,
-                "streak": h.streak,
-                "created": h.created.isoformat(),
-                "last_completed": h.last_completed.isoformat() if h.last_completed else None,
-                "history": [c.done_on.isoformat() for c in h.completions.order_by(Completion.done_on.asc())]
-            } for h in habits
-        ]
-    })
+    return jsonify({"habits": _habits_json(db.session)})
 
-@app.post("/api/habits")
+@api.post("/api/habits")
 def api_add_habit():
     name = (request.json or {}).get("name", "").strip()
     if not name:
@@ -97,7 +132,7 @@ def api_add_habit():
     db.session.commit()
     return {"ok": True, "id": h.id}, 201
 
-@app.post("/api/habits/<int:habit_id>/toggle")
+@api.post("/api/habits/<int:habit_id>/toggle")
 def api_toggle(habit_id):
     h = Habit.query.get_or_404(habit_id)
     today = date.today()
@@ -139,7 +174,7 @@ def _parse_dates(maybe_list):
             pass
     return out
 
-@app.patch("/api/habits/<int:habit_id>")
+@api.patch("/api/habits/<int:habit_id>")
 def api_update_habit(habit_id):
     h = Habit.query.get_or_404(habit_id)
     data = request.json or {}
@@ -196,19 +231,9 @@ def api_update_habit(habit_id):
                 return {"error": "invalid streak"}, 400
 
     db.session.commit()
-    return {
-        "ok": True,
-        "habit": {
-            "id": h.id,
-            "name": h.name,
-            "streak": h.streak,
-            "created": h.created.isoformat(),
-            "last_completed": h.last_completed.isoformat() if h.last_completed else None,
-            "history": [c.done_on.isoformat() for c in h.completions.order_by(Completion.done_on.asc())]
-        }
-    }
+    return {"ok": True, "habit": _habit_json(h)}
 
-@app.post("/api/habits/<int:habit_id>/toggle-date")
+@api.post("/api/habits/<int:habit_id>/toggle-date")
 def api_toggle_date(habit_id):
     h = Habit.query.get_or_404(habit_id)
     ds = (request.json or {}).get("date", "")
@@ -228,40 +253,88 @@ def api_toggle_date(habit_id):
     return {"ok": True, "streak": h.streak,
             "last_completed": h.last_completed.isoformat() if h.last_completed else None}
 
-@app.delete("/api/habits/<int:habit_id>")
+@api.delete("/api/habits/<int:habit_id>")
 def api_delete(habit_id):
     h = Habit.query.get_or_404(habit_id)
     db.session.delete(h)
     db.session.commit()
     return {"ok": True}
 
-@app.get("/api/stats")
+@api.get("/api/stats")
 def api_stats():
-    habits = Habit.query.all()
-    total_habits = len(habits)
-    total_completions = sum(h.streak or 0 for h in habits)
-    longest_streak = max([h.streak or 0 for h in habits], default=0)
-    average_streak = round(total_completions / total_habits, 2) if total_habits else 0
-    return {
-        "total_habits": total_habits,
-        "total_completions": total_completions,
-        "longest_streak": longest_streak,
-        "average_streak": average_streak
-    }
+    return _stats_json(db.session)
 
-@app.get("/api/calendar")
+@api.get("/api/calendar")
 def api_calendar():
-    habits = Habit.query.order_by(Habit.id.asc()).all()
-    events = []
-    palette = ['#FF6B6B','#6BCB77','#4D96FF','#FFD93D','#A66DD4','#00C49A','#FBA834','#FF90BC','#8ACDD7','#BDB2FF']
-    for i, h in enumerate(habits):
-        color = palette[i % len(palette)]
-        for c in h.completions.order_by(Completion.done_on.asc()).all():
-            events.append({"title": h.name, "start": c.done_on.isoformat(), "color": color})
-    return {"events": events}
+    return {"events": _calendar_events(db.session)}
+
+# --- Dashboard: habits + stats + one calendar month in a single request ---
+
+# Shared and bounded, so concurrent dashboard loads queue instead of
+# opening an unbounded number of SQLite readers.
+_dashboard_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="dashboard")
+_read_engine_lock = threading.Lock()
+
+def _read_engine(app):
+    """Engine for off-thread dashboard reads, or None to read inline.
+
+    File SQLite gets a separate read-only engine (WAL lets it read while
+    writers commit); in-memory SQLite can't be shared between connections.
+    """
+    if "read_engine" not in app.extensions:
+        with _read_engine_lock:
+            if "read_engine" not in app.extensions:
+                url = db.engine.url
+                if url.get_backend_name() != "sqlite":
+                    engine = db.engine
+                elif url.database in (None, "", ":memory:"):
+                    engine = None
+                else:
+                    # build the URI from the path so '#', '?' and '%' in it are escaped
+                    ro_uri = Path(url.database).resolve().as_uri() + "?mode=ro"
+                    engine = create_engine(url, creator=lambda: sqlite3.connect(
+                        ro_uri, uri=True, check_same_thread=False))
+                app.extensions["read_engine"] = engine
+    return app.extensions["read_engine"]
+
+def _read_with(engine, fn, *args):
+    with Session(engine) as s:
+        return fn(s, *args)
+
+def _month_range(ym):
+    start = datetime.strptime(ym, "%Y-%m").date() if ym else date.today().replace(day=1)
+    end = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start, end
+
+@api.get("/api/dashboard")
+def api_dashboard():
+    try:
+        start, end = _month_range((request.args.get("month") or "").strip())
+    except (ValueError, OverflowError):  # 9999-12 has no following month
+        return {"error": "invalid month (YYYY-MM)"}, 400
+
+    engine = _read_engine(current_app._get_current_object())
+    if engine is None:
+        habits = _habits_json(db.session)
+        stats = _stats_json(db.session)
+        events = _calendar_events(db.session, start, end)
+    else:
+        # Each read runs in its own session/transaction, so the three parts
+        # are not one consistent snapshot: a write landing between them
+        # (e.g. a new habit) can show up in `habits` but not in `stats`.
+        f_habits = _dashboard_pool.submit(_read_with, engine, _habits_json)
+        f_stats = _dashboard_pool.submit(_read_with, engine, _stats_json)
+        f_events = _dashboard_pool.submit(_read_with, engine, _calendar_events, start, end)
+        habits, stats, events = f_habits.result(), f_stats.result(), f_events.result()
+
+    return jsonify({
+        "habits": habits,
+        "stats": stats,
+        "calendar": {"month": start.strftime("%Y-%m"), "events": events},
+    })
 
 #--Auth
-@app.post("/api/auth/register")
+@api.post("/api/auth/register")
 def register():
     data = request.json or {}
     email = (data.get("email") or "").strip().lower()
@@ -276,7 +349,7 @@ def register():
     login_user(u)  # auto-login after signup
     return {"ok": True, "user": {"id": u.id, "email": u.email}}
 
-@app.post("/api/auth/login")
+@api.post("/api/auth/login")
 def login():
     data = request.json or {}
     email = (data.get("email") or "").strip().lower()
@@ -287,35 +360,81 @@ def login():
     login_user(u)
     return {"ok": True, "user": {"id": u.id, "email": u.email}}
 
-@app.post("/api/auth/logout")
+@api.post("/api/auth/logout")
 @login_required
 def logout():
     logout_user()
     return {"ok": True}
 
-@app.get("/api/auth/me")
+@api.get("/api/auth/me")
 def me():
     if current_user.is_authenticated:
         return {"user": {"id": current_user.id, "email": current_user.email}}
     return {"user": None}
 
 #errorhandler 
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(e):
     return {"error": "Not found"}, 404
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def server_error(e):
     return {"error": "Server error"}, 500
 
 # health check
-@app.get("/")
+@api.get("/")
 def health():
     return {"status": "ok"}
 
-with app.app_context():
+# --- App factory ---
+def create_app(config=None):
+    app = Flask(__name__, instance_relative_config=True)
+    # CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})  # ← enable if not using Vite proxy
+
+    # --- Database setup (SQLite under instance/ unless overridden) ---
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(app.instance_path, "habits.db")
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+
+    # --- app + session cookie tweaks (optional but good) ---
+    app.config.update(
+        SESSION_COOKIE_HTTPONLY=True,
+        SESSION_COOKIE_SAMESITE="Lax",  # fine for same-site proxy
+        # SESSION_COOKIE_SECURE=True,   # enable in production (HTTPS)
+    )
+    if config:
+        app.config.update(config)
+
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite:///" + app.instance_path):
+        Path(app.instance_path).mkdir(parents=True, exist_ok=True)
+
+    db.init_app(app)
+    migrate.init_app(app, db)
+    login_manager.init_app(app)
+    app.register_blueprint(api)
+    app.cli.add_command(init_db)
+
+    # WAL so dashboard readers don't block (or get blocked by) writers
+    with app.app_context():
+        if db.engine.url.get_backend_name() == "sqlite" and db.engine.url.database not in (None, "", ":memory:"):
+            event.listen(db.engine, "connect", _enable_wal)
+
+    if app.config.get("CREATE_SCHEMA"):
+        with app.app_context():
+            db.create_all()
+
+    return app
+
+def _enable_wal(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.close()
+
+# schema setup is an explicit step: `flask --app app init-db`
+@click.command("init-db")
+@with_appcontext
+def init_db():
     db.create_all()
+    click.echo("Initialized the database.")
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5050, debug=True)
-
+    create_app().run(host="0.0.0.0", port=5050, debug=True)
@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app import TEST_CONFIG, create_app, db, _read_engine
+
+TODAY = date.today()
+THIS_MONTH = TODAY.strftime("%Y-%m")
+LAST_MONTH = (TODAY.replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+
+
+def _seed(client):
+    for n in range(5):
+        hid = client.post("/api/habits", json={"name": f"habit {n}"}).json["id"]
+        # spans this and last month, spacing differs per habit
+        days = [(TODAY - timedelta(days=d)).isoformat() for d in range(0, 45, n + 1)]
+        client.patch(f"/api/habits/{hid}", json={"history": days})
+
+
+def _events_for(client, month):
+    events = client.get("/api/calendar").json["events"]
+    return [e for e in events if e["start"].startswith(month)]
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    # '#', '%' and space in the path must survive the read-only URI
+    db_dir = tmp_path / "w 2#x%"
+    db_dir.mkdir()
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite:///" + str(db_dir / "habits.db")})
+    result = app.test_cli_runner().invoke(args=["init-db"])
+    assert result.exit_code == 0, result.output
+    _seed(app.test_client())
+    yield app
+    with app.app_context():
+        engine = _read_engine(app)
+        if engine is not None:
+            engine.dispose()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def memory_app():
+    app = create_app(TEST_CONFIG)
+    _seed(app.test_client())
+    return app
+
+
+def test_file_db_uses_separate_read_engine(file_app):
+    with file_app.app_context():
+        engine = _read_engine(file_app)
+        assert engine is not None
+        assert engine is not db.engine
+
+
+def test_memory_db_reads_inline(memory_app):
+    with memory_app.app_context():
+        assert _read_engine(memory_app) is None
+
+
+@pytest.mark.parametrize("app_fixture", ["file_app", "memory_app"])
+@pytest.mark.parametrize("month", [None, THIS_MONTH, LAST_MONTH])
+def test_dashboard_matches_individual_endpoints(request, app_fixture, month):
+    client = request.getfixturevalue(app_fixture).test_client()
+    url = "/api/dashboard" + (f"?month={month}" if month else "")
+    r = client.get(url)
+    assert r.status_code == 200
+
+    data = r.json
+    expected_month = month or THIS_MONTH
+    assert data["habits"] == client.get("/api/habits").json["habits"]
+    assert data["stats"] == client.get("/api/stats").json
+    assert data["calendar"]["month"] == expected_month
+    assert data["calendar"]["events"] == _events_for(client, expected_month)
+    assert data["calendar"]["events"]
+
+
+@pytest.mark.parametrize("app_fixture", ["file_app", "memory_app"])
+@pytest.mark.parametrize("month", ["2020-13", "2020-1x", "nope", "9999-12"])
+def test_dashboard_bad_month(request, app_fixture, month):
+    client = request.getfixturevalue(app_fixture).test_client()
+    r = client.get(f"/api/dashboard?month={month}")
+    assert r.status_code == 400
+    assert r.json == {"error": "invalid month (YYYY-MM)"}